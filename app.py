@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
+import textwrap
+import plotly.graph_objects as go
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
 try:
     from reportlab.lib.pagesizes import letter, A4, A3, landscape, legal
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle, PageBreak
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
     from reportlab.lib import colors
@@ -20,74 +22,124 @@ st.set_page_config(
     layout="wide"
 )
 
-def calculate_days_held(row):
-    """Calculate days held from acquisition date to today (or sale date if sold)"""
+# Required fields checked for data completeness (column -> display name)
+REQUIRED_FIELDS = {
+    'custom.All_APN': 'APN',
+    'custom.All_Asset_Surveyed_Acres': 'Surveyed Acres',
+    'custom.All_County': 'County',
+    'custom.All_RemarkableLand_URL': 'RemarkableLand URL',
+    'custom.All_State': 'State',
+    'custom.Asset_Cost_Basis': 'Cost Basis',
+    'custom.Asset_Date_Purchased': 'Date Purchased',
+    'custom.Asset_Original_Listing_Price': 'Original Listing Price',
+    'custom.Asset_Land_ID_Internal_URL': 'Land ID Internal URL',
+    'custom.Asset_Land_ID_Share_URL': 'Land ID Share URL',
+    'custom.Asset_MLS#': 'MLS#',
+    'custom.Asset_MLS_Listing_Date': 'MLS Listing Date',
+    'custom.Asset_Street_Address': 'Street Address',
+    'custom.Asset_Last_Mapping_Audit': 'Last Map Audit',
+    'custom.Asset_Owner': 'Owner',
+    'custom.Asset_Listing_Type': 'Listing Type',
+    'avg_one_time_active_opportunity_value': 'Avg One Time Active Opportunity Value'
+}
+
+# Placeholder values that count as missing for text fields
+MISSING_SENTINELS = frozenset({'', 'Unknown', 'Unknown County'})
+
+# Checklist checkbox label per required field (long names truncated to fit three per row)
+CHECKLIST_FIELD_LABELS = {name: '☐ ' + name[:18] + ('...' if len(name) > 18 else '') for name in REQUIRED_FIELDS.values()}
+
+# Opportunity statuses in report order
+STATUS_ORDER = ['Purchased', 'Listed', 'Under Contract', 'Off Market']
+
+# Status color-coding glyphs (Streamlit dataframes and the PDFs don't support colored text)
+STATUS_GLYPHS = {
+    'Purchased': '🔴',       # Red circle
+    'Listed': '🔵',          # Blue circle
+    'Under Contract': '🟢',  # Green circle
+    'Off Market': '🟡'       # Yellow circle
+}
+STATUS_LABELS = {status: f"{glyph} {status}" for status, glyph in STATUS_GLYPHS.items()}
+
+def order_statuses(statuses):
+    """Return statuses as an ordered categorical: STATUS_ORDER first, then any other labels"""
+    if isinstance(statuses.dtype, pd.CategoricalDtype) and statuses.cat.ordered:
+        return statuses  # Already ordered by process_data
+    other_statuses = sorted(set(statuses.dropna()) - set(STATUS_ORDER), key=str)
+    return statuses.astype(pd.CategoricalDtype(STATUS_ORDER + other_statuses, ordered=True))
+
+def parse_dates(values):
+    """Parse a column of date strings to tz-naive UTC timestamps; unparseable values become NaT"""
     try:
-        purchase_date = row.get('custom.Asset_Date_Purchased')
-        if pd.isna(purchase_date):
-            return None
-        
-        purchase_dt = pd.to_datetime(purchase_date)
-        
-        # For now, calculate to today (can be enhanced later to use sale date if available)
-        return (datetime.now() - purchase_dt).days
-    except:
-        return None
+        # utc=True lets ISO "Z" dates and mixed offsets parse together instead of raising
+        dates = pd.to_datetime(values, errors='coerce', format='mixed', utc=True)
+    except (ValueError, TypeError, OverflowError):
+        # Fall back to one value at a time so a single bad cell only loses its own date
+        dates = pd.to_datetime(values.map(_parse_date), utc=True)
+    return dates.dt.tz_localize(None)
 
-def check_missing_information(row):
-    """Check for missing required fields and return status"""
-    required_fields = {
-        'custom.All_APN': 'APN',
-        'custom.All_Asset_Surveyed_Acres': 'Surveyed Acres',
-        'custom.All_County': 'County',
-        'custom.All_RemarkableLand_URL': 'RemarkableLand URL',
-        'custom.All_State': 'State',
-        'custom.Asset_Cost_Basis': 'Cost Basis',
-        'custom.Asset_Date_Purchased': 'Date Purchased',
-        'custom.Asset_Original_Listing_Price': 'Original Listing Price',
-        'custom.Asset_Land_ID_Internal_URL': 'Land ID Internal URL',
-        'custom.Asset_Land_ID_Share_URL': 'Land ID Share URL',
-        'custom.Asset_MLS#': 'MLS#',
-        'custom.Asset_MLS_Listing_Date': 'MLS Listing Date',
-        'custom.Asset_Street_Address': 'Street Address',
-        'custom.Asset_Last_Mapping_Audit': 'Last Map Audit',
-        'custom.Asset_Owner': 'Owner',
-        'custom.Asset_Listing_Type': 'Listing Type',
-        'avg_one_time_active_opportunity_value': 'Avg One Time Active Opportunity Value'
-    }
-    
-    missing_fields = []
+def _parse_date(value):
+    try:
+        return pd.to_datetime(value, utc=True)
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+
+def check_missing_information(df):
+    """Check every row for missing required fields; return a status label and the missing field names per row"""
+    missing = np.ones((len(df), len(REQUIRED_FIELDS)), dtype=bool)
     
-    for field_key, field_name in required_fields.items():
-        if field_key in row.index:
-            value = row[field_key]
+    for i, field_key in enumerate(REQUIRED_FIELDS):
+        if field_key in df.columns:
+            values = df[field_key]
             # Special handling for Cost Basis - treat 0 as missing
             if field_key == 'custom.Asset_Cost_Basis':
-                if pd.isna(value) or value == '' or value == 0:
-                    missing_fields.append(field_name)
+                missing[:, i] = (values.isna() | values.isin(['', 0])).to_numpy()
             else:
-                if pd.isna(value) or value == '' or value == 'Unknown' or value == 'Unknown County':
-                    missing_fields.append(field_name)
-        else:
-            missing_fields.append(field_name)
-    
-    if not missing_fields:
-        return "✅ Complete"
-    else:
-        return "❌ Missing: " + ", ".join(missing_fields)
+                missing[:, i] = (values.isna() | values.isin(MISSING_SENTINELS)).to_numpy()
+    
+    # Build one label per distinct missing-field pattern, then broadcast back to the rows
+    field_names = np.array(list(REQUIRED_FIELDS.values()))
+    patterns, inverse = np.unique(missing, axis=0, return_inverse=True)
+    pattern_fields = [field_names[pattern].tolist() for pattern in patterns]
+    labels = np.array([
+        "❌ Missing: " + ", ".join(fields) if fields else "✅ Complete"
+        for fields in pattern_fields
+    ], dtype=object)
+    missing_fields = np.empty(len(pattern_fields), dtype=object)
+    missing_fields[:] = pattern_fields
+    
+    inverse = inverse.reshape(-1)
+    return pd.Series(labels[inverse], index=df.index), pd.Series(missing_fields[inverse], index=df.index)
+
+def load_csv(file_bytes):
+    """Read the uploaded CSV export"""
+    # C engine on purpose: the pyarrow engine infers timestamp types (even with dtype=str),
+    # while the date columns must stay raw strings for parse_dates and the N/A fallbacks
+    return pd.read_csv(BytesIO(file_bytes))
+
+@st.cache_data(show_spinner="Processing portfolio...")
+def load_portfolio(file_bytes):
+    """Read and process the uploaded CSV export (cached on the raw file bytes, so the DataFrame is never hashed)"""
+    return process_data(load_csv(file_bytes))
 
 def process_data(df):
     """Process and clean the uploaded data"""
     try:
-        processed_df = df.copy()
+        # Shallow copy: every step below replaces whole columns, so the uploaded data is never duplicated or mutated
+        processed_df = df.copy(deep=False)
         
         # Clean and standardize data
         if 'custom.All_County' in processed_df.columns:
-            processed_df['custom.All_County'] = processed_df['custom.All_County'].fillna('Unknown County')
-            processed_df['custom.All_County'] = processed_df['custom.All_County'].astype(str).str.title()
-        
-        # Calculate days held first
-        processed_df['days_held'] = processed_df.apply(calculate_days_held, axis=1)
+            counties = processed_df['custom.All_County'].fillna('Unknown County').astype(str)
+            # Title-case each distinct county once instead of every row
+            processed_df['custom.All_County'] = counties.map({county: county.title() for county in counties.unique()})
+        
+        # Calculate days held first: acquisition date to today (can be enhanced later to use sale date if available)
+        if 'custom.Asset_Date_Purchased' in processed_df.columns:
+            purchase_dates = parse_dates(processed_df['custom.Asset_Date_Purchased'])
+            processed_df['days_held'] = (pd.Timestamp.now() - purchase_dates).dt.days
+        else:
+            processed_df['days_held'] = None
         
         # Convert key numeric columns to ensure proper data types
         numeric_columns = [
@@ -97,111 +149,135 @@ def process_data(df):
             'custom.Asset_Original_Listing_Price'
         ]
         
-        for col in numeric_columns:
-            if col in processed_df.columns:
-                processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce').fillna(0)
+        numeric_columns = [col for col in numeric_columns if col in processed_df.columns]
+        processed_df[numeric_columns] = processed_df[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
         
         # Calculate metrics with better error handling
         processed_df['price_reductions'] = 0  # Default value
         if 'primary_opportunity_value' in processed_df.columns:
             try:
-                # Ensure the function is properly called
-                def calc_price_reductions(price):
-                    try:
-                        if pd.isna(price) or price == 0:
-                            return 0
-                        trailing_digit = int(str(int(price))[-1])
-                        reduction_map = {9: 0, 8: 1, 7: 2, 6: 3, 5: 4, 4: 5, 3: 6, 2: 7, 1: 8, 0: 9}
-                        return reduction_map.get(trailing_digit, 0)
-                    except:
-                        return 0
-                
-                processed_df['price_reductions'] = processed_df['primary_opportunity_value'].apply(calc_price_reductions)
+                # Reductions are tracked by the trailing digit of the whole-dollar price: 9 -> 0, 8 -> 1, ..., 0 -> 9
+                prices = processed_df['primary_opportunity_value'].to_numpy(dtype=float)
+                valid = np.isfinite(prices) & (prices != 0)
+                trailing_digits = np.abs(np.trunc(np.where(valid, prices, 0))).astype(np.int64) % 10
+                processed_df['price_reductions'] = np.where(valid, (9 - trailing_digits) % 10, 0).astype(np.int8)  # 0-9 fits in a byte
             except Exception as e:
                 st.warning(f"Could not calculate price reductions: {str(e)}")
                 processed_df['price_reductions'] = 0
         
-        # Financial calculations with better error handling
-        processed_df['current_margin'] = 0
-        processed_df['current_margin_pct'] = 0
-        if all(col in processed_df.columns for col in ['primary_opportunity_value', 'custom.Asset_Cost_Basis']):
-            try:
-                processed_df['current_margin'] = processed_df['primary_opportunity_value'] - processed_df['custom.Asset_Cost_Basis']
-                # Avoid division by zero
-                mask = processed_df['primary_opportunity_value'] != 0
-                processed_df.loc[mask, 'current_margin_pct'] = (processed_df.loc[mask, 'current_margin'] / processed_df.loc[mask, 'primary_opportunity_value'] * 100)
-            except Exception as e:
-                st.warning(f"Could not calculate financial metrics: {str(e)}")
-                processed_df['current_margin'] = 0
-                processed_df['current_margin_pct'] = 0
+        # Financial calculations in one vectorized block (ratios are 0 where the denominator is 0)
+        def numeric_values(col):
+            return processed_df[col].to_numpy(dtype=float) if col in processed_df.columns else None
         
-        # Price per acre with better error handling
-        processed_df['price_per_acre'] = 0
-        if all(col in processed_df.columns for col in ['primary_opportunity_value', 'custom.All_Asset_Surveyed_Acres']):
-            try:
-                # Avoid division by zero
-                mask = processed_df['custom.All_Asset_Surveyed_Acres'] != 0
-                processed_df.loc[mask, 'price_per_acre'] = processed_df.loc[mask, 'primary_opportunity_value'] / processed_df.loc[mask, 'custom.All_Asset_Surveyed_Acres']
-            except Exception as e:
-                st.warning(f"Could not calculate price per acre: {str(e)}")
-                processed_df['price_per_acre'] = 0
+        def ratio(numerator, denominator, scale=1):
+            if numerator is None or denominator is None:
+                return 0
+            # Ratios are display/aggregation values only, so single precision is plenty
+            return (np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0) * scale).astype(np.float32)
         
-        # Calculate markup percentage with better error handling
-        processed_df['markup_percentage'] = 0
-        if all(col in processed_df.columns for col in ['primary_opportunity_value', 'custom.Asset_Cost_Basis']):
-            try:
-                # Avoid division by zero
-                mask = processed_df['custom.Asset_Cost_Basis'] != 0
-                processed_df.loc[mask, 'markup_percentage'] = ((processed_df.loc[mask, 'primary_opportunity_value'] - processed_df.loc[mask, 'custom.Asset_Cost_Basis']) / 
-                                                              processed_df.loc[mask, 'custom.Asset_Cost_Basis'] * 100)
-            except Exception as e:
-                st.warning(f"Could not calculate markup percentage: {str(e)}")
-                processed_df['markup_percentage'] = 0
-        
-        # Calculate cost basis per acre with better error handling
-        processed_df['cost_basis_per_acre'] = 0
-        if all(col in processed_df.columns for col in ['custom.Asset_Cost_Basis', 'custom.All_Asset_Surveyed_Acres']):
-            try:
-                # Avoid division by zero
-                mask = processed_df['custom.All_Asset_Surveyed_Acres'] != 0
-                processed_df.loc[mask, 'cost_basis_per_acre'] = processed_df.loc[mask, 'custom.Asset_Cost_Basis'] / processed_df.loc[mask, 'custom.All_Asset_Surveyed_Acres']
-            except Exception as e:
-                st.warning(f"Could not calculate cost basis per acre: {str(e)}")
-                processed_df['cost_basis_per_acre'] = 0
-        
-        # Calculate percent of original listing price with better error handling
-        processed_df['percent_of_initial_listing'] = 0
-        if all(col in processed_df.columns for col in ['primary_opportunity_value', 'custom.Asset_Original_Listing_Price']):
-            try:
-                # Avoid division by zero
-                mask = processed_df['custom.Asset_Original_Listing_Price'] != 0
-                processed_df.loc[mask, 'percent_of_initial_listing'] = (processed_df.loc[mask, 'primary_opportunity_value'] / 
-                                                                       processed_df.loc[mask, 'custom.Asset_Original_Listing_Price'] * 100)
-            except Exception as e:
-                st.warning(f"Could not calculate percent of initial listing: {str(e)}")
-                processed_df['percent_of_initial_listing'] = 0
+        try:
+            value = numeric_values('primary_opportunity_value')
+            cost = numeric_values('custom.Asset_Cost_Basis')
+            acres = numeric_values('custom.All_Asset_Surveyed_Acres')
+            original_price = numeric_values('custom.Asset_Original_Listing_Price')
+            margin = value - cost if value is not None and cost is not None else None
+            
+            metrics = {
+                'current_margin': margin if margin is not None else 0,
+                'current_margin_pct': ratio(margin, value, 100),
+                'price_per_acre': ratio(value, acres),
+                'markup_percentage': ratio(margin, cost, 100),
+                'cost_basis_per_acre': ratio(cost, acres),
+                'percent_of_initial_listing': ratio(value, original_price, 100)
+            }
+        except Exception as e:
+            st.warning(f"Could not calculate financial metrics: {str(e)}")
+            metrics = dict.fromkeys(['current_margin', 'current_margin_pct', 'price_per_acre', 'markup_percentage',
+                                     'cost_basis_per_acre', 'percent_of_initial_listing'], 0)
+        processed_df = processed_df.assign(**metrics)
         
         # Check missing information for each property
-        processed_df['missing_information'] = processed_df.apply(check_missing_information, axis=1)
+        processed_df['missing_information'], processed_df['missing_fields'] = check_missing_information(processed_df)
+        processed_df['is_complete'] = processed_df['missing_information'] == '✅ Complete'
+        
+        # Low-cardinality grouping columns as categoricals (status ordered for report sorting)
+        if 'primary_opportunity_status_label' in processed_df.columns:
+            processed_df['primary_opportunity_status_label'] = order_statuses(processed_df['primary_opportunity_status_label'])
+        for col in ['custom.All_State', 'custom.All_County', 'custom.Asset_Listing_Type', 'custom.Asset_Owner']:
+            if col in processed_df.columns:
+                processed_df[col] = processed_df[col].astype('category')
         
         return processed_df
         
     except Exception as e:
         st.error(f"Error in process_data: {str(e)}")
         # Return basic dataframe with minimal processing
-        basic_df = df.copy()
-        basic_df['days_held'] = None
-        basic_df['price_reductions'] = 0
-        basic_df['current_margin'] = 0
-        basic_df['current_margin_pct'] = 0
-        basic_df['price_per_acre'] = 0
-        basic_df['markup_percentage'] = 0
-        basic_df['cost_basis_per_acre'] = 0
-        basic_df['percent_of_initial_listing'] = 0
-        basic_df['missing_information'] = "Error processing"
-        return basic_df
+        return df.assign(
+            days_held=None,
+            price_reductions=0,
+            current_margin=0,
+            current_margin_pct=0,
+            price_per_acre=0,
+            markup_percentage=0,
+            cost_basis_per_acre=0,
+            percent_of_initial_listing=0,
+            missing_information="Error processing",
+            missing_fields=[[] for _ in range(len(df))],
+            is_complete=False
+        )
+
+def summarize_dimensions(df):
+    """Compute the counts, totals and hierarchy aggregates shared by the dashboard sections"""
+    agg = {}
+    for key, col in [('status', 'primary_opportunity_status_label'),
+                     ('state', 'custom.All_State'),
+                     ('county', 'custom.All_County')]:
+        if col in df.columns:
+            counts = df[col].value_counts()
+            counts = counts[counts > 0]  # drop categories with no rows after owner filtering
+            agg[f'{key}_counts'] = counts
+            agg[f'{key}_sorted'] = sorted(counts.index.tolist())
+    
+    # Level 1 per-status totals and averages in one groupby
+    if 'primary_opportunity_status_label' in df.columns:
+        status_aggs = {'properties': ('primary_opportunity_status_label', 'size')}
+        for key, col, func in [('total_value', 'primary_opportunity_value', 'sum'),
+                               ('avg_days_held', 'days_held', 'mean'),
+                               ('avg_reductions', 'price_reductions', 'mean')]:
+            if col in df.columns:
+                status_aggs[key] = (col, func)
+        # days_held is all None when there are no purchase dates, so average it as float
+        stats_df = df.assign(days_held=df['days_held'].astype(float)) if 'days_held' in df.columns else df
+        agg['status_stats'] = stats_df.groupby('primary_opportunity_status_label', observed=True).agg(**status_aggs)
+    
+    # Portfolio totals
+    for key, col in [('total_value', 'primary_opportunity_value'),
+                     ('total_cost', 'custom.Asset_Cost_Basis')]:
+        if col in df.columns:
+            agg[key] = df[col].sum()
+    
+    if 'missing_information' in df.columns:
+        agg['complete_count'] = int(df['is_complete'].sum())
+        
+        # Status → State → County groups (sorted key order, missing states/counties dropped)
+        agg['states_by_status'] = {}
+        agg['counties_by_state'] = {}
+        group_counts = {'properties': ('is_complete', 'size'), 'complete': ('is_complete', 'sum')}
+        if 'primary_opportunity_status_label' in df.columns and 'custom.All_State' in df.columns:
+            state_stats = df.groupby(['primary_opportunity_status_label', 'custom.All_State'], observed=True).agg(**group_counts)
+            agg['states_by_status'] = {status: stats.droplevel(0) for status, stats in state_stats.groupby(level=0, observed=True)}
+            
+            if 'custom.All_County' in df.columns:
+                county_aggs = dict(group_counts)
+                if 'primary_opportunity_value' in df.columns:
+                    county_aggs['total_value'] = ('primary_opportunity_value', 'sum')
+                if 'custom.All_Asset_Surveyed_Acres' in df.columns:
+                    county_aggs['avg_acres'] = ('custom.All_Asset_Surveyed_Acres', 'mean')
+                county_stats = df.groupby(['primary_opportunity_status_label', 'custom.All_State', 'custom.All_County'], observed=True).agg(**county_aggs)
+                agg['counties_by_state'] = {key: stats.droplevel([0, 1]) for key, stats in county_stats.groupby(level=[0, 1], observed=True)}
+    return agg
 
-def display_hierarchy_breakdown(df):
+def display_hierarchy_breakdown(df, agg):
     """Display the Status → State → County hierarchy with correct order"""
     st.header("📊 Portfolio Hierarchy: Status → State → County")
     
@@ -213,17 +289,15 @@ def display_hierarchy_breakdown(df):
     
     with col2:
         if 'primary_opportunity_value' in df.columns:
-            total_value = df['primary_opportunity_value'].sum()
-            st.metric("Portfolio Value", f"${total_value:,.0f}")
+            st.metric("Portfolio Value", f"${agg['total_value']:,.0f}")
     
     with col3:
         if 'custom.Asset_Cost_Basis' in df.columns:
-            total_cost = df['custom.Asset_Cost_Basis'].sum()
-            st.metric("Total Cost Basis", f"${total_cost:,.0f}")
+            st.metric("Total Cost Basis", f"${agg['total_cost']:,.0f}")
     
     with col4:
         if 'missing_information' in df.columns:
-            complete_count = len(df[df['missing_information'] == '✅ Complete'])
+            complete_count = agg['complete_count']
             completion_rate = (complete_count / len(df)) * 100
             st.metric("Data Complete", f"{complete_count}/{len(df)} ({completion_rate:.0f}%)")
     
@@ -231,72 +305,90 @@ def display_hierarchy_breakdown(df):
     
     # Hierarchical breakdown with CORRECT ORDER
     if 'primary_opportunity_status_label' in df.columns:
-        status_order = ['Purchased', 'Listed', 'Under Contract', 'Off Market']
-        available_statuses = df['primary_opportunity_status_label'].unique()
-        ordered_statuses = [status for status in status_order if status in available_statuses]
+        ordered_statuses = [status for status in STATUS_ORDER if status in agg['status_counts'].index]
         
         # Level 1: By Status (in correct order)
         st.subheader("🎯 Level 1: By Opportunity Status")
         
-        status_summary = []
+        status_stats = agg['status_stats'].loc[ordered_statuses]
+        
+        def formatted(key, fmt):
+            if key not in status_stats.columns:
+                return 'N/A'
+            return np.where(status_stats[key].notna(), status_stats[key].map(fmt.format), 'N/A')
+        
+        if len(status_stats) > 0:
+            status_summary = pd.DataFrame({
+                'Status': ordered_statuses,
+                'Properties': status_stats['properties'].to_numpy(),
+                'Total Value': formatted('total_value', '${:,.0f}'),
+                'Avg Days Held': formatted('avg_days_held', '{:.0f}'),
+                'Avg Reductions': formatted('avg_reductions', '{:.1f}')
+            })
+            st.dataframe(status_summary, use_container_width=True)
+        
+        # Level 2 & 3: Expandable State and County breakdown from the precomputed groups
+        states_by_status = agg['states_by_status']
+        counties_by_state = agg['counties_by_state']
         for status in ordered_statuses:
             if pd.notna(status):
-                status_df = df[df['primary_opportunity_status_label'] == status]
-                summary = {
-                    'Status': status,
-                    'Properties': len(status_df),
-                    'Total Value': f"${status_df['primary_opportunity_value'].sum():,.0f}" if 'primary_opportunity_value' in df.columns else 'N/A',
-                    'Avg Days Held': f"{status_df['days_held'].mean():.0f}" if 'days_held' in status_df.columns and status_df['days_held'].notna().any() else 'N/A',
-                    'Avg Reductions': f"{status_df['price_reductions'].mean():.1f}" if 'price_reductions' in status_df.columns and status_df['price_reductions'].notna().any() else 'N/A'
-                }
-                status_summary.append(summary)
-        
-        if status_summary:
-            st.dataframe(pd.DataFrame(status_summary), use_container_width=True)
-        
-        # Level 2 & 3: Expandable State and County breakdown
-        for status in ordered_statuses:
-            if pd.notna(status):
-                status_df = df[df['primary_opportunity_status_label'] == status]
-                
-                with st.expander(f"📋 {status} ({len(status_df)} properties) - State & County Breakdown"):
+                with st.expander(f"📋 {status} ({agg['status_counts'][status]} properties) - State & County Breakdown"):
                     
-                    if 'custom.All_State' in status_df.columns:
+                    if 'custom.All_State' in df.columns:
                         st.write("**Level 2: By State**")
                         
-                        for state in sorted(status_df['custom.All_State'].unique()):
-                            if pd.notna(state):
-                                state_df = status_df[status_df['custom.All_State'] == state]
-                                
-                                complete_count = len(state_df[state_df['missing_information'] == '✅ Complete'])
-                                incomplete_count = len(state_df) - complete_count
-                                
-                                st.write(f"**{state}** ({len(state_df)} properties | ✅ {complete_count} complete | ❌ {incomplete_count} incomplete)")
+                        state_rows = states_by_status.get(status)
+                        if state_rows is None:
+                            continue
+                        
+                        for state, properties, complete_count in zip(state_rows.index, state_rows['properties'], state_rows['complete']):
+                            incomplete_count = properties - complete_count
+                            
+                            st.write(f"**{state}** ({properties} properties | ✅ {complete_count} complete | ❌ {incomplete_count} incomplete)")
+                            
+                            county_rows = counties_by_state.get((status, state))
+                            if county_rows is not None:
+                                # Render the aggregates directly; value and acres stay numeric and are formatted by column_config
+                                incomplete_county = county_rows['properties'] - county_rows['complete']
+                                county_summary = county_rows.assign(
+                                    complete="✅ " + county_rows['complete'].astype(str),
+                                    incomplete=np.where(incomplete_county > 0, "❌ " + incomplete_county.astype(str), "✅ 0")
+                                ).reindex(columns=['properties', 'complete', 'incomplete', 'total_value', 'avg_acres'], fill_value='N/A')
+                                county_summary = county_summary.rename_axis('County').reset_index().rename(columns={
+                                    'properties': 'Properties',
+                                    'complete': 'Complete',
+                                    'incomplete': 'Incomplete',
+                                    'total_value': 'Total Value',
+                                    'avg_acres': 'Avg Acres'
+                                })
                                 
-                                if 'custom.All_County' in state_df.columns:
-                                    county_summary = []
-                                    for county in sorted(state_df['custom.All_County'].unique()):
-                                        if pd.notna(county):
-                                            county_df = state_df[state_df['custom.All_County'] == county]
-                                            complete_county = len(county_df[county_df['missing_information'] == '✅ Complete'])
-                                            incomplete_county = len(county_df) - complete_county
-                                            
-                                            county_summary.append({
-                                                'County': county,
-                                                'Properties': len(county_df),
-                                                'Complete': f"✅ {complete_county}",
-                                                'Incomplete': f"❌ {incomplete_county}" if incomplete_county > 0 else "✅ 0",
-                                                'Total Value': f"${county_df['primary_opportunity_value'].sum():,.0f}" if 'primary_opportunity_value' in county_df.columns else 'N/A',
-                                                'Avg Acres': f"{county_df['custom.All_Asset_Surveyed_Acres'].mean():.1f}" if 'custom.All_Asset_Surveyed_Acres' in county_df.columns else 'N/A'
-                                            })
-                                    
-                                    if county_summary:
-                                        st.dataframe(pd.DataFrame(county_summary), use_container_width=True)
+                                st.dataframe(county_summary, use_container_width=True, column_config={
+                                    'Total Value': CURRENCY_COLUMN,
+                                    'Avg Acres': st.column_config.NumberColumn(format="%.1f")
+                                })
+
+@st.cache_data(show_spinner=False)
+def status_pie_figure(labels, values):
+    """Build the status distribution pie (cached on the counts)"""
+    return go.Figure(go.Pie(values=list(values), labels=list(labels),
+                            marker_colors=['#2E8B57', '#4169E1', '#FF6347', '#FFD700']))
+
+@st.cache_data(show_spinner=False)
+def state_bar_figure(states, counts):
+    """Build the state distribution bar chart (cached on the counts)"""
+    fig = go.Figure(go.Bar(x=list(states), y=list(counts),
+                           marker=dict(color=list(counts), colorscale='Viridis', showscale=True)))
+    fig.update_layout(xaxis_title='State', yaxis_title='Properties')
+    return fig
 
-def create_visualizations(df):
+def create_visualizations(df, agg):
     """Create portfolio visualizations with correct status order"""
     st.header("📈 Portfolio Visualizations")
     
+    if len(df) == 0:
+        st.info("No properties to chart.")
+        return
+    
     col1, col2 = st.columns(2)
     
     # Status distribution
@@ -304,33 +396,29 @@ def create_visualizations(df):
         if 'primary_opportunity_status_label' in df.columns:
             st.subheader("Distribution by Status")
             
-            status_order = ['Purchased', 'Listed', 'Under Contract', 'Off Market']
-            status_counts = df['primary_opportunity_status_label'].value_counts()
+            status_counts = agg['status_counts']
             
             ordered_labels = []
             ordered_values = []
-            for status in status_order:
+            for status in STATUS_ORDER:
                 if status in status_counts.index:
                     ordered_labels.append(status)
-                    ordered_values.append(status_counts[status])
+                    ordered_values.append(int(status_counts[status]))
             
-            fig = px.pie(values=ordered_values, names=ordered_labels,
-                        color_discrete_sequence=['#2E8B57', '#4169E1', '#FF6347', '#FFD700'])
+            fig = status_pie_figure(tuple(ordered_labels), tuple(ordered_values))
             st.plotly_chart(fig, use_container_width=True)
     
     # State distribution
     with col2:
         if 'custom.All_State' in df.columns:
             st.subheader("Distribution by State")
-            state_counts = df['custom.All_State'].value_counts()
-            fig = px.bar(x=state_counts.index, y=state_counts.values, 
-                        labels={'x': 'State', 'y': 'Properties'},
-                        color=state_counts.values,
-                        color_continuous_scale='viridis')
+            state_counts = agg['state_counts']
+            fig = state_bar_figure(tuple(state_counts.index.tolist()), tuple(state_counts.tolist()))
             st.plotly_chart(fig, use_container_width=True)
 
+@lru_cache(maxsize=4096)
 def wrap_text_smart(text, max_length=30):
-    """Smart text wrapping that preserves readability for legal size"""
+    """Smart text wrapping that preserves readability for legal size (cached: owners and counties repeat across rows)"""
     if pd.isna(text) or text == '':
         return 'N/A'
     
@@ -338,24 +426,119 @@ def wrap_text_smart(text, max_length=30):
     if len(text_str) <= max_length:
         return text_str
     
-    # For property names, try to break at natural points
-    words = text_str.split()
-    lines = []
-    current_line = ""
+    # For property names, break at natural points: between words, never inside one
+    lines = textwrap.wrap(" ".join(text_str.split()), width=max_length, break_long_words=False, break_on_hyphens=False)
     
-    for word in words:
-        test_line = current_line + (" " + word if current_line else word)
-        if len(test_line) <= max_length:
-            current_line = test_line
-        else:
-            if current_line:
-                lines.append(current_line)
-            current_line = word
+    return "<br/>".join(lines)
+
+def format_inventory_rows(section_df):
+    """Format a report section as one tuple of cell strings per property, formatting each column in one pass"""
+    def column(col, default=np.nan):
+        return section_df[col] if col in section_df.columns else pd.Series(default, index=section_df.index, dtype=object)
+    
+    def wrapped(col, max_length, default='N/A'):
+        return [wrap_text_smart(value, max_length) for value in column(col, default)]
+    
+    def formatted(col, fmt, positive_only=False):
+        # Coerce first: format is mapped over every value, so None/strings in object columns must become NaN
+        values = pd.to_numeric(column(col), errors='coerce')
+        show = values.notna() & (values > 0) if positive_only else values.notna()
+        return np.where(show, values.map(fmt.format), 'N/A')
+    
+    # Dates are parsed for the whole column at once; unparseable values are shown as-is
+    purchased = column('custom.Asset_Date_Purchased')
+    purchase_dates = parse_dates(purchased)
+    date_purchased = np.where(
+        purchased.isna(), 'N/A',
+        np.where(purchase_dates.notna(), purchase_dates.dt.strftime('%m/%d/%Y'), purchased.astype(object).map(str))
+    )
     
-    if current_line:
-        lines.append(current_line)
+    return list(zip(
+        wrapped('display_name', 25, 'Unknown Property'),
+        wrapped('custom.Asset_Owner', 15),
+        column('custom.All_State', 'N/A').astype(object).map(str),
+        wrapped('custom.All_County', 15),
+        formatted('custom.All_Asset_Surveyed_Acres', '{:.1f}'),
+        date_purchased,
+        formatted('custom.Asset_Cost_Basis', '${:,.0f}', positive_only=True),
+        formatted('primary_opportunity_value', '${:,.0f}', positive_only=True),
+        formatted('current_margin', '${:,.0f}'),
+        formatted('current_margin_pct', '{:.0f}%'),
+        formatted('markup_percentage', '{:.0f}%'),
+        formatted('price_per_acre', '${:,.0f}', positive_only=True),
+        formatted('cost_basis_per_acre', '${:,.0f}', positive_only=True),
+        formatted('custom.Asset_Original_Listing_Price', '${:,.0f}', positive_only=True),
+        formatted('percent_of_initial_listing', '{:.0f}%'),
+        formatted('days_held', '{:.0f}')
+    ))
+
+if REPORTLAB_AVAILABLE:
+    # Inventory report table layouts, built once at import and shared by every section
+    # Section table column widths for legal landscape (~13.7 inches available with narrow margins)
+    INVENTORY_COL_WIDTHS = [
+        1.5*inch,  # Property Name
+        0.9*inch,  # Owner
+        0.5*inch,  # State
+        0.9*inch,  # County
+        0.6*inch,  # Acres
+        0.9*inch,  # Date Purchased
+        0.9*inch,  # Cost Basis
+        1.0*inch,  # Current Price
+        0.9*inch,  # Profit Margin
+        0.6*inch,  # Margin %
+        0.6*inch,  # Markup %
+        0.9*inch,  # Price/Acre
+        0.9*inch,  # Cost/Acre
+        1.0*inch,  # Original Price
+        0.6*inch,  # %OLP
+        0.5*inch   # DOM
+    ]
     
-    return "<br/>".join(lines)
+    # Enhanced section table styling with column-specific alignment
+    INVENTORY_TABLE_STYLE = TableStyle([
+        # Header row styling
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+        
+        # Data rows styling
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        
+        # Column-specific alignment for data rows
+        ('ALIGN', (0, 1), (1, -1), 'LEFT'),     # Property Name and Owner - LEFT
+        ('ALIGN', (2, 1), (3, -1), 'CENTER'),   # State and County - CENTER
+        ('ALIGN', (4, 1), (-1, -1), 'RIGHT'),   # All remaining columns - RIGHT
+        
+        ('VALIGN', (0, 1), (-1, -1), 'TOP'),   # Top align for wrapped text
+        
+        # Grid lines
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        
+        # Alternating row colors for better readability
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        
+        # Better padding for readability
+        ('TOPPADDING', (0, 0), (-1, -1), 5),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ])
+    
+    # Section summary (2x4) layout
+    INVENTORY_SUMMARY_COL_WIDTHS = [1.8*inch, 1.5*inch, 1.8*inch, 1.5*inch]
+    INVENTORY_SUMMARY_STYLE = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ])
 
 def generate_inventory_report_pdf(df):
     """Generate a comprehensive PDF inventory report with legal size and narrow margins"""
@@ -462,6 +645,16 @@ def generate_inventory_report_pdf(df):
         leftIndent=12
     )
     
+    # Table cells share one style, and repeated cell text ('N/A', states, owners...) shares one Paragraph
+    cell_style = styles['Normal']
+    cell_paragraphs = {}
+    
+    def cell(text):
+        paragraph = cell_paragraphs.get(text)
+        if paragraph is None:
+            paragraph = cell_paragraphs[text] = Paragraph(text, cell_style)
+        return paragraph
+    
     # Title and date
     story.append(Paragraph("Remarkable Land LLC - Inventory Report", title_style))
     story.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style))
@@ -479,20 +672,18 @@ def generate_inventory_report_pdf(df):
         ("Off Market (Secondary)", 'Off Market', 'Secondary')
     ]
     
+    # Partition the properties by (status, listing type) once; each section looks up its rows
+    partitions = dict(list(df.groupby(['primary_opportunity_status_label', 'custom.Asset_Listing_Type'], observed=True)))
+    no_properties = df.iloc[:0]
+    
     # Process primary sections first
-    primary_data_for_summary = df[
-        (df['primary_opportunity_status_label'].isin(['Purchased', 'Listed', 'Under Contract', 'Off Market'])) & 
-        (df['custom.Asset_Listing_Type'] == 'Primary')
-    ].copy()
+    primary_data_for_summary = pd.concat([partitions.get((status, 'Primary'), no_properties) for status in STATUS_ORDER])
     
     section_count = 0
     
     for section_name, status, listing_type in primary_sections:
         # Filter data for this section
-        section_df = df[
-            (df['primary_opportunity_status_label'] == status) & 
-            (df['custom.Asset_Listing_Type'] == listing_type)
-        ].copy()
+        section_df = partitions.get((status, listing_type), no_properties)
         
         if len(section_df) == 0:
             continue  # Skip empty sections
@@ -521,111 +712,15 @@ def generate_inventory_report_pdf(df):
         # Sort by state, then county, then property name
         section_df = section_df.sort_values(['custom.All_State', 'custom.All_County', 'display_name'])
         
-        for _, row in section_df.iterrows():
-            # Property name with smart wrapping
-            property_name = wrap_text_smart(row.get('display_name', 'Unknown Property'), 25)
-            owner = wrap_text_smart(row.get('custom.Asset_Owner', 'N/A'), 15)
-            state = str(row.get('custom.All_State', 'N/A'))
-            county = wrap_text_smart(row.get('custom.All_County', 'N/A'), 15)
-            acres = f"{row.get('custom.All_Asset_Surveyed_Acres', 0):.1f}" if pd.notna(row.get('custom.All_Asset_Surveyed_Acres')) else 'N/A'
-            
-            # Format date purchased
-            date_purchased = 'N/A'
-            if pd.notna(row.get('custom.Asset_Date_Purchased')):
-                try:
-                    date_val = pd.to_datetime(row.get('custom.Asset_Date_Purchased'))
-                    date_purchased = date_val.strftime('%m/%d/%Y')
-                except:
-                    date_purchased = str(row.get('custom.Asset_Date_Purchased'))
-            
-            # Format financial data
-            cost_basis = f"${row.get('custom.Asset_Cost_Basis', 0):,.0f}" if pd.notna(row.get('custom.Asset_Cost_Basis')) and row.get('custom.Asset_Cost_Basis', 0) > 0 else 'N/A'
-            asking_price = f"${row.get('primary_opportunity_value', 0):,.0f}" if pd.notna(row.get('primary_opportunity_value')) and row.get('primary_opportunity_value', 0) > 0 else 'N/A'
-            profit_margin = f"${row.get('current_margin', 0):,.0f}" if pd.notna(row.get('current_margin')) else 'N/A'
-            margin_pct = f"{row.get('current_margin_pct', 0):.0f}%" if pd.notna(row.get('current_margin_pct')) else 'N/A'
-            markup = f"{row.get('markup_percentage', 0):.0f}%" if pd.notna(row.get('markup_percentage')) else 'N/A'
-            price_per_acre = f"${row.get('price_per_acre', 0):,.0f}" if pd.notna(row.get('price_per_acre')) and row.get('price_per_acre', 0) > 0 else 'N/A'
-            cost_per_acre = f"${row.get('cost_basis_per_acre', 0):,.0f}" if pd.notna(row.get('cost_basis_per_acre')) and row.get('cost_basis_per_acre', 0) > 0 else 'N/A'
-            original_price = f"${row.get('custom.Asset_Original_Listing_Price', 0):,.0f}" if pd.notna(row.get('custom.Asset_Original_Listing_Price')) and row.get('custom.Asset_Original_Listing_Price', 0) > 0 else 'N/A'
-            percent_olp = f"{row.get('percent_of_initial_listing', 0):.0f}%" if pd.notna(row.get('percent_of_initial_listing')) else 'N/A'
-            days_held_val = f"{row.get('days_held', 0):.0f}" if pd.notna(row.get('days_held')) else 'N/A'
-            
-            # Create table row with Paragraph objects for proper text wrapping
-            table_data.append([
-                Paragraph(property_name, styles['Normal']),
-                Paragraph(owner, styles['Normal']),
-                Paragraph(state, styles['Normal']),
-                Paragraph(county, styles['Normal']),
-                Paragraph(acres, styles['Normal']),
-                Paragraph(date_purchased, styles['Normal']),
-                Paragraph(cost_basis, styles['Normal']),
-                Paragraph(asking_price, styles['Normal']),
-                Paragraph(profit_margin, styles['Normal']),
-                Paragraph(margin_pct, styles['Normal']),
-                Paragraph(markup, styles['Normal']),
-                Paragraph(price_per_acre, styles['Normal']),
-                Paragraph(cost_per_acre, styles['Normal']),
-                Paragraph(original_price, styles['Normal']),
-                Paragraph(percent_olp, styles['Normal']),
-                Paragraph(days_held_val, styles['Normal'])
-            ])
+        # Cell text for every row is formatted up front, column by column
+        for name, owner, state, county, acres, date_purchased, *values in format_inventory_rows(section_df):
+            # Paragraphs for the wrapped text columns and Date Purchased (unparseable dates are shown
+            # as typed and must wrap); short values are drawn as plain strings
+            table_data.append([cell(name), cell(owner), state, cell(county), acres, cell(date_purchased), *values])
         
         if len(table_data) > 1:  # Only create table if there's data beyond headers
-            # Optimized column widths for legal landscape (~13.7 inches available with narrow margins)
-            col_widths = [
-                1.5*inch,  # Property Name
-                0.9*inch,  # Owner
-                0.5*inch,  # State
-                0.9*inch,  # County
-                0.6*inch,  # Acres
-                0.9*inch,  # Date Purchased
-                0.9*inch,  # Cost Basis
-                1.0*inch,  # Current Price
-                0.9*inch,  # Profit Margin
-                0.6*inch,  # Margin %
-                0.6*inch,  # Markup %
-                0.9*inch,  # Price/Acre
-                0.9*inch,  # Cost/Acre
-                1.0*inch,  # Original Price
-                0.6*inch,  # %OLP
-                0.5*inch   # DOM
-            ]
-            
-            table = Table(table_data, colWidths=col_widths, repeatRows=1)
-            
-            # Enhanced table styling with column-specific alignment
-            table.setStyle(TableStyle([
-                # Header row styling
-                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-                
-                # Data rows styling
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                
-                # Column-specific alignment for data rows
-                ('ALIGN', (0, 1), (1, -1), 'LEFT'),     # Property Name and Owner - LEFT
-                ('ALIGN', (2, 1), (3, -1), 'CENTER'),   # State and County - CENTER
-                ('ALIGN', (4, 1), (-1, -1), 'RIGHT'),   # All remaining columns - RIGHT
-                
-                ('VALIGN', (0, 1), (-1, -1), 'TOP'),   # Top align for wrapped text
-                
-                # Grid lines
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-                
-                # Alternating row colors for better readability
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-                
-                # Better padding for readability
-                ('TOPPADDING', (0, 0), (-1, -1), 5),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-                ('LEFTPADDING', (0, 0), (-1, -1), 4),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ]))
+            table = Table(table_data, colWidths=INVENTORY_COL_WIDTHS, repeatRows=1)
+            table.setStyle(INVENTORY_TABLE_STYLE)
             
             story.append(table)
             story.append(Spacer(1, 20))
@@ -657,16 +752,8 @@ def generate_inventory_report_pdf(df):
             ['Median Days Held', median_days_held_str, 'Portfolio Margin %', f'{margin_pct:.1f}%']
         ]
         
-        summary_table = Table(summary_data, colWidths=[1.8*inch, 1.5*inch, 1.8*inch, 1.5*inch])
-        summary_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        summary_table = Table(summary_data, colWidths=INVENTORY_SUMMARY_COL_WIDTHS)
+        summary_table.setStyle(INVENTORY_SUMMARY_STYLE)
         
         story.append(summary_table)
         story.append(Spacer(1, 28))
@@ -711,10 +798,7 @@ def generate_inventory_report_pdf(df):
     # Process secondary sections
     for section_name, status, listing_type in secondary_sections:
         # Filter data for this section
-        section_df = df[
-            (df['primary_opportunity_status_label'] == status) & 
-            (df['custom.Asset_Listing_Type'] == listing_type)
-        ].copy()
+        section_df = partitions.get((status, listing_type), no_properties)
         
         if len(section_df) == 0:
             continue  # Skip empty sections
@@ -738,111 +822,15 @@ def generate_inventory_report_pdf(df):
         # Sort by state, then county, then property name
         section_df = section_df.sort_values(['custom.All_State', 'custom.All_County', 'display_name'])
         
-        for _, row in section_df.iterrows():
-            # Property name with smart wrapping
-            property_name = wrap_text_smart(row.get('display_name', 'Unknown Property'), 25)
-            owner = wrap_text_smart(row.get('custom.Asset_Owner', 'N/A'), 15)
-            state = str(row.get('custom.All_State', 'N/A'))
-            county = wrap_text_smart(row.get('custom.All_County', 'N/A'), 15)
-            acres = f"{row.get('custom.All_Asset_Surveyed_Acres', 0):.1f}" if pd.notna(row.get('custom.All_Asset_Surveyed_Acres')) else 'N/A'
-            
-            # Format date purchased
-            date_purchased = 'N/A'
-            if pd.notna(row.get('custom.Asset_Date_Purchased')):
-                try:
-                    date_val = pd.to_datetime(row.get('custom.Asset_Date_Purchased'))
-                    date_purchased = date_val.strftime('%m/%d/%Y')
-                except:
-                    date_purchased = str(row.get('custom.Asset_Date_Purchased'))
-            
-            # Format financial data
-            cost_basis = f"${row.get('custom.Asset_Cost_Basis', 0):,.0f}" if pd.notna(row.get('custom.Asset_Cost_Basis')) and row.get('custom.Asset_Cost_Basis', 0) > 0 else 'N/A'
-            asking_price = f"${row.get('primary_opportunity_value', 0):,.0f}" if pd.notna(row.get('primary_opportunity_value')) and row.get('primary_opportunity_value', 0) > 0 else 'N/A'
-            profit_margin = f"${row.get('current_margin', 0):,.0f}" if pd.notna(row.get('current_margin')) else 'N/A'
-            margin_pct = f"{row.get('current_margin_pct', 0):.0f}%" if pd.notna(row.get('current_margin_pct')) else 'N/A'
-            markup = f"{row.get('markup_percentage', 0):.0f}%" if pd.notna(row.get('markup_percentage')) else 'N/A'
-            price_per_acre = f"${row.get('price_per_acre', 0):,.0f}" if pd.notna(row.get('price_per_acre')) and row.get('price_per_acre', 0) > 0 else 'N/A'
-            cost_per_acre = f"${row.get('cost_basis_per_acre', 0):,.0f}" if pd.notna(row.get('cost_basis_per_acre')) and row.get('cost_basis_per_acre', 0) > 0 else 'N/A'
-            original_price = f"${row.get('custom.Asset_Original_Listing_Price', 0):,.0f}" if pd.notna(row.get('custom.Asset_Original_Listing_Price')) and row.get('custom.Asset_Original_Listing_Price', 0) > 0 else 'N/A'
-            percent_olp = f"{row.get('percent_of_initial_listing', 0):.0f}%" if pd.notna(row.get('percent_of_initial_listing')) else 'N/A'
-            days_held_val = f"{row.get('days_held', 0):.0f}" if pd.notna(row.get('days_held')) else 'N/A'
-            
-            # Create table row with Paragraph objects for proper text wrapping
-            table_data.append([
-                Paragraph(property_name, styles['Normal']),
-                Paragraph(owner, styles['Normal']),
-                Paragraph(state, styles['Normal']),
-                Paragraph(county, styles['Normal']),
-                Paragraph(acres, styles['Normal']),
-                Paragraph(date_purchased, styles['Normal']),
-                Paragraph(cost_basis, styles['Normal']),
-                Paragraph(asking_price, styles['Normal']),
-                Paragraph(profit_margin, styles['Normal']),
-                Paragraph(margin_pct, styles['Normal']),
-                Paragraph(markup, styles['Normal']),
-                Paragraph(price_per_acre, styles['Normal']),
-                Paragraph(cost_per_acre, styles['Normal']),
-                Paragraph(original_price, styles['Normal']),
-                Paragraph(percent_olp, styles['Normal']),
-                Paragraph(days_held_val, styles['Normal'])
-            ])
+        # Cell text for every row is formatted up front, column by column
+        for name, owner, state, county, acres, date_purchased, *values in format_inventory_rows(section_df):
+            # Paragraphs for the wrapped text columns and Date Purchased (unparseable dates are shown
+            # as typed and must wrap); short values are drawn as plain strings
+            table_data.append([cell(name), cell(owner), state, cell(county), acres, cell(date_purchased), *values])
         
         if len(table_data) > 1:  # Only create table if there's data beyond headers
-            # Optimized column widths for legal landscape (~13.7 inches available with narrow margins)
-            col_widths = [
-                1.5*inch,  # Property Name
-                0.9*inch,  # Owner
-                0.5*inch,  # State
-                0.9*inch,  # County
-                0.6*inch,  # Acres
-                0.9*inch,  # Date Purchased
-                0.9*inch,  # Cost Basis
-                1.0*inch,  # Current Price
-                0.9*inch,  # Profit Margin
-                0.6*inch,  # Margin %
-                0.6*inch,  # Markup %
-                0.9*inch,  # Price/Acre
-                0.9*inch,  # Cost/Acre
-                1.0*inch,  # Original Price
-                0.6*inch,  # %OLP
-                0.5*inch   # DOM
-            ]
-            
-            table = Table(table_data, colWidths=col_widths, repeatRows=1)
-            
-            # Enhanced table styling with column-specific alignment
-            table.setStyle(TableStyle([
-                # Header row styling
-                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-                
-                # Data rows styling
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                
-                # Column-specific alignment for data rows
-                ('ALIGN', (0, 1), (1, -1), 'LEFT'),     # Property Name and Owner - LEFT
-                ('ALIGN', (2, 1), (3, -1), 'CENTER'),   # State and County - CENTER
-                ('ALIGN', (4, 1), (-1, -1), 'RIGHT'),   # All remaining columns - RIGHT
-                
-                ('VALIGN', (0, 1), (-1, -1), 'TOP'),   # Top align for wrapped text
-                
-                # Grid lines
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-                
-                # Alternating row colors for better readability
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-                
-                # Better padding for readability
-                ('TOPPADDING', (0, 0), (-1, -1), 5),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-                ('LEFTPADDING', (0, 0), (-1, -1), 4),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ]))
+            table = Table(table_data, colWidths=INVENTORY_COL_WIDTHS, repeatRows=1)
+            table.setStyle(INVENTORY_TABLE_STYLE)
             
             story.append(table)
             story.append(Spacer(1, 20))
@@ -874,16 +862,8 @@ def generate_inventory_report_pdf(df):
             ['Median Days Held', median_days_held_str, 'Portfolio Margin %', f'{margin_pct:.1f}%']
         ]
         
-        summary_table = Table(summary_data, colWidths=[1.8*inch, 1.5*inch, 1.8*inch, 1.5*inch])
-        summary_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        summary_table = Table(summary_data, colWidths=INVENTORY_SUMMARY_COL_WIDTHS)
+        summary_table.setStyle(INVENTORY_SUMMARY_STYLE)
         
         story.append(summary_table)
         story.append(Spacer(1, 28))
@@ -978,48 +958,34 @@ def generate_inventory_report_pdf(df):
         st.error(f"Error generating PDF: {str(e)}")
         return None
 
-def generate_missing_fields_checklist_pdf(df):
-    """Generate a super compact PDF checklist of missing fields for each property"""
-    if not REPORTLAB_AVAILABLE:
-        st.error("PDF generation requires reportlab. Please install it: pip install reportlab")
-        return None
-    
-    # Create a BytesIO buffer for the PDF
-    buffer = BytesIO()
-    
-    # Create the PDF document with very tight margins
-    doc = SimpleDocTemplate(buffer, pagesize=letter, 
-                          topMargin=0.4*inch, bottomMargin=0.4*inch,
-                          leftMargin=0.4*inch, rightMargin=0.4*inch)
-    story = []
-    
-    # Get styles and create super compact styles
-    styles = getSampleStyleSheet()
+if REPORTLAB_AVAILABLE:
+    # Get styles and create super compact styles for the checklist once at import
+    PDF_STYLES = getSampleStyleSheet()
     
     # Super compact title style
-    title_style = ParagraphStyle(
+    CHECKLIST_TITLE_STYLE = ParagraphStyle(
         'SuperCompactTitle',
-        parent=styles['Heading1'],
+        parent=PDF_STYLES['Heading1'],
         fontSize=12,
         spaceAfter=8,
         spaceBefore=0,
         alignment=1  # Center alignment
     )
-    
+
     # Super compact heading styles
-    state_style = ParagraphStyle(
+    CHECKLIST_STATE_STYLE = ParagraphStyle(
         'StateHeading',
-        parent=styles['Heading2'],
+        parent=PDF_STYLES['Heading2'],
         fontSize=10,
         spaceAfter=2,
         spaceBefore=6,
         textColor=colors.black,
         fontName='Helvetica-Bold'
     )
-    
-    county_style = ParagraphStyle(
+
+    CHECKLIST_COUNTY_STYLE = ParagraphStyle(
         'CountyHeading',
-        parent=styles['Heading3'],
+        parent=PDF_STYLES['Heading3'],
         fontSize=9,
         spaceAfter=1,
         spaceBefore=4,
@@ -1027,56 +993,71 @@ def generate_missing_fields_checklist_pdf(df):
         textColor=colors.darkblue,
         fontName='Helvetica-Bold'
     )
-    
-    property_style = ParagraphStyle(
+
+    CHECKLIST_PROPERTY_STYLE = ParagraphStyle(
         'PropertyStyle',
-        parent=styles['Normal'],
+        parent=PDF_STYLES['Normal'],
         fontSize=8,
         spaceAfter=1,
         spaceBefore=2,
         leftIndent=16,
         fontName='Helvetica-Bold'
     )
-    
+
     # Super compact date style
-    date_style = ParagraphStyle(
+    CHECKLIST_DATE_STYLE = ParagraphStyle(
         'DateStyle',
-        parent=styles['Normal'],
+        parent=PDF_STYLES['Normal'],
         fontSize=7,
         spaceAfter=4,
         alignment=1  # Center alignment
     )
+
+    # Super compact checklist table: three 1.8" checkbox columns centered between two margin columns
+    # that fill out the frame width (letter minus 0.4" margins and the frame's 6pt side padding)
+    CHECKLIST_MARGIN_WIDTH = (letter[0] - 0.8*inch - 12 - 5.4*inch) / 2
+    CHECKLIST_COL_WIDTHS = [CHECKLIST_MARGIN_WIDTH, 1.8*inch, 1.8*inch, 1.8*inch, CHECKLIST_MARGIN_WIDTH]
+    CHECKLIST_TABLE_COMMANDS = [
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),  # Very small font
+        ('LEFTPADDING', (0, 0), (-1, -1), 20),  # Indent from property name
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),   # No top padding
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 0), # No bottom padding
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def generate_missing_fields_checklist_pdf(_df, file_bytes, generated_on):
+    """Generate a super compact PDF checklist of missing fields for each property
+
+    Cached on the uploaded file bytes _df was processed from; the frame itself (with its
+    missing_fields list column) is never hashed. generated_on is the date printed on the
+    checklist, passed in so a cached PDF is never stamped with an earlier day.
+    """
+    df = _df
+    if not REPORTLAB_AVAILABLE:
+        st.error("PDF generation requires reportlab. Please install it: pip install reportlab")
+        return None
     
-    # Title and date
-    story.append(Paragraph("Property Data Completeness Checklist", title_style))
-    story.append(Paragraph(f"Generated: {datetime.now().strftime('%m/%d/%Y')}", date_style))
+    # Create a BytesIO buffer for the PDF
+    buffer = BytesIO()
     
-    # Required fields for reference
-    required_fields = {
-        'custom.All_APN': 'APN',
-        'custom.All_Asset_Surveyed_Acres': 'Surveyed Acres',
-        'custom.All_County': 'County',
-        'custom.All_RemarkableLand_URL': 'RemarkableLand URL',
-        'custom.All_State': 'State',
-        'custom.Asset_Cost_Basis': 'Cost Basis',
-        'custom.Asset_Date_Purchased': 'Date Purchased',
-        'custom.Asset_Original_Listing_Price': 'Original Listing Price',
-        'custom.Asset_Land_ID_Internal_URL': 'Land ID Internal URL',
-        'custom.Asset_Land_ID_Share_URL': 'Land ID Share URL',
-        'custom.Asset_MLS#': 'MLS#',
-        'custom.Asset_MLS_Listing_Date': 'MLS Listing Date',
-        'custom.Asset_Street_Address': 'Street Address',
-        'custom.Asset_Last_Mapping_Audit': 'Last Map Audit',
-        'custom.Asset_Owner': 'Owner',
-        'custom.Asset_Listing_Type': 'Listing Type',
-        'avg_one_time_active_opportunity_value': 'Avg One Time Active Opportunity Value'
-    }
+    # Create the PDF document with very tight margins
+    doc = SimpleDocTemplate(buffer, pagesize=letter, 
+                          topMargin=0.4*inch, bottomMargin=0.4*inch,
+                          leftMargin=0.4*inch, rightMargin=0.4*inch)
+    story = []
+    
+    # Title and date
+    story.append(Paragraph("Property Data Completeness Checklist", CHECKLIST_TITLE_STYLE))
+    story.append(Paragraph(f"Generated: {generated_on}", CHECKLIST_DATE_STYLE))
     
     # Filter to only properties with missing information
-    incomplete_properties = df[df['missing_information'] != '✅ Complete'].copy()
+    incomplete_properties = df[~df['is_complete']].copy()
     
     if len(incomplete_properties) == 0:
-        story.append(Paragraph("🎉 Congratulations! All properties have complete data.", styles['Normal']))
+        story.append(Paragraph("🎉 Congratulations! All properties have complete data.", PDF_STYLES['Normal']))
         doc.build(story)
         buffer.seek(0)
         return buffer
@@ -1084,12 +1065,10 @@ def generate_missing_fields_checklist_pdf(df):
     # Sort by Status first, then State, then County, then Property Name
     sort_columns = []
     
-    # Add status sorting with custom order
+    # Add status sorting with custom order (ordered categorical, no temporary column)
     if 'primary_opportunity_status_label' in incomplete_properties.columns:
-        # Create a status order mapping for sorting
-        status_order_map = {'Purchased': 1, 'Listed': 2, 'Under Contract': 3, 'Off Market': 4}
-        incomplete_properties['_status_sort'] = incomplete_properties['primary_opportunity_status_label'].map(status_order_map).fillna(999)
-        sort_columns.append('_status_sort')
+        incomplete_properties['primary_opportunity_status_label'] = order_statuses(incomplete_properties['primary_opportunity_status_label'])
+        sort_columns.append('primary_opportunity_status_label')
     
     if 'custom.All_State' in incomplete_properties.columns:
         sort_columns.append('custom.All_State')
@@ -1099,99 +1078,73 @@ def generate_missing_fields_checklist_pdf(df):
         sort_columns.append('display_name')
     
     if sort_columns:
-        incomplete_properties = incomplete_properties.sort_values(sort_columns)
-        
-        # Remove the temporary sort column
-        if '_status_sort' in incomplete_properties.columns:
-            incomplete_properties = incomplete_properties.drop('_status_sort', axis=1)
-    
-    # Group by Status, State and County for ultra-compact layout
-    current_status = None
-    current_state = None
-    current_county = None
-    
-    for _, row in incomplete_properties.iterrows():
-        status = row.get('primary_opportunity_status_label', 'Unknown Status')
-        state = row.get('custom.All_State', 'Unknown State')
-        county = row.get('custom.All_County', 'Unknown County')
-        property_name = row.get('display_name', 'Unknown Property')
-        missing_info = row.get('missing_information', '')
-        
-        # Add status header if changed (new top-level grouping)
-        if status != current_status:
-            current_status = status
-            story.append(Spacer(1, 8))  # Slightly more spacing for status changes
+        incomplete_properties = incomplete_properties.sort_values(sort_columns, kind='mergesort')
+    
+    # Fill in grouping columns that are absent from the export
+    for col, default in [('primary_opportunity_status_label', 'Unknown Status'),
+                         ('custom.All_State', 'Unknown State'),
+                         ('custom.All_County', 'Unknown County'),
+                         ('display_name', 'Unknown Property')]:
+        if col not in incomplete_properties.columns:
+            incomplete_properties[col] = default
+    
+    # Truncate very long property names for better fit, all at once
+    property_names = incomplete_properties['display_name'].fillna('Unknown Property').astype(str)
+    incomplete_properties['display_name'] = property_names.str.slice(0, 60) + np.where(property_names.str.len() > 60, "...", "")
+    
+    # Lay the whole checklist out as one LongTable: header rows span every column, checkbox rows
+    # fill the three centered middle columns (one layout pass instead of one per property)
+    table_rows = []
+    table_style = list(CHECKLIST_TABLE_COMMANDS)
+    
+    def add_header_row(text, style, spacing):
+        # Spacer + paragraph spacing become cell padding (Paragraph spacing is ignored inside tables)
+        row = len(table_rows)
+        table_rows.append([Paragraph(text, style)] + [''] * (len(CHECKLIST_COL_WIDTHS) - 1))
+        table_style.extend([
+            ('SPAN', (0, row), (-1, row)),
+            ('LEFTPADDING', (0, row), (-1, row), 0),
+            ('RIGHTPADDING', (0, row), (-1, row), 0),
+            ('TOPPADDING', (0, row), (-1, row), spacing + style.spaceBefore),
+            ('BOTTOMPADDING', (0, row), (-1, row), style.spaceAfter),
+        ])
+    
+    # Group by Status, State and County for ultra-compact layout (data is already sorted)
+    for status, status_df in incomplete_properties.groupby('primary_opportunity_status_label', sort=False, dropna=False, observed=True):
+        # Format status with color coding
+        status_display = f"{STATUS_GLYPHS.get(status, '')} {str(status).upper()}".strip()  # A blank status is a NaN group
+        
+        # Add status header (new top-level grouping, slightly more spacing for status changes)
+        add_header_row(f"STATUS: {status_display}", CHECKLIST_TITLE_STYLE, 8)
+        
+        for state, state_df in status_df.groupby('custom.All_State', sort=False, dropna=False, observed=True):
+            # Add state header (ultra compact)
+            add_header_row(f"STATE: {state}", CHECKLIST_STATE_STYLE, 4)
             
-            # Format status with color coding
-            if status == 'Purchased':
-                status_display = f"🔴 {status.upper()}"
-            elif status == 'Listed':
-                status_display = f"🔵 {status.upper()}"
-            elif status == 'Under Contract':
-                status_display = f"🟢 {status.upper()}"
-            elif status == 'Off Market':
-                status_display = f"🟡 {status.upper()}"
-            else:
-                status_display = status.upper()
+            for county, county_df in state_df.groupby('custom.All_County', sort=False, dropna=False, observed=True):
+                # Add county header (ultra compact)
+                add_header_row(f"{county} County", CHECKLIST_COUNTY_STYLE, 2)
                 
-            story.append(Paragraph(f"STATUS: {status_display}", title_style))
-            current_state = None  # Reset state when status changes
-            current_county = None  # Reset county when status changes
-        
-        # Add state header if changed (ultra compact)
-        if state != current_state:
-            current_state = state
-            story.append(Spacer(1, 4))  # Minimal spacing
-            story.append(Paragraph(f"STATE: {state}", state_style))
-            current_county = None  # Reset county when state changes
-        
-        # Add county header if changed (ultra compact)
-        if county != current_county:
-            current_county = county
-            story.append(Spacer(1, 2))  # Minimal spacing
-            story.append(Paragraph(f"{county} County", county_style))
-        
-        # Property name (ultra compact)
-        story.append(Spacer(1, 1))  # Minimal spacing
-        # Truncate very long property names for better fit
-        display_name = property_name[:60] + "..." if len(property_name) > 60 else property_name
-        story.append(Paragraph(f"{display_name}", property_style))
-        
-        # Parse missing fields and create ultra-compact checkboxes in 3 columns
-        if missing_info.startswith('❌ Missing: '):
-            missing_fields_text = missing_info.replace('❌ Missing: ', '')
-            missing_fields_list = [field.strip() for field in missing_fields_text.split(',')]
-            
-            # Create ultra-compact checklist - 3 items per row for maximum space utilization
-            if missing_fields_list:
-                rows = []
-                for i in range(0, len(missing_fields_list), 3):
-                    row = []
-                    for j in range(3):
-                        if i + j < len(missing_fields_list):
-                            field = missing_fields_list[i + j]
-                            # Truncate long field names
-                            short_field = field[:18] + ('...' if len(field) > 18 else '')
-                            row.append('☐ ' + short_field)
-                        else:
-                            row.append('')
-                    rows.append(row)
+                names = county_df['display_name'].to_numpy()
+                missings = county_df['missing_fields'].to_numpy()
                 
-                # Create super compact table with 3 columns
-                if rows:
-                    checklist_table = Table(rows, colWidths=[1.8*inch, 1.8*inch, 1.8*inch])
-                    checklist_table.setStyle(TableStyle([
-                        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                        ('FONTSIZE', (0, 0), (-1, -1), 7),  # Very small font
-                        ('LEFTPADDING', (0, 0), (-1, -1), 20),  # Indent from property name
-                        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                        ('TOPPADDING', (0, 0), (-1, -1), 0),   # No top padding
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 0), # No bottom padding
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ]))
-                    story.append(checklist_table)
-        
-        # No spacing between properties to maximize density
+                for property_name, missing_fields_list in zip(names, missings):
+                    # Property name (ultra compact)
+                    add_header_row(f"{property_name}", CHECKLIST_PROPERTY_STYLE, 1)
+                    
+                    # Create ultra-compact checklist - 3 items per row for maximum space utilization
+                    if missing_fields_list:
+                        # Precomputed checkbox labels, padded to a multiple of 3 cells
+                        checklist_cells = np.array(
+                            [CHECKLIST_FIELD_LABELS[field] for field in missing_fields_list]
+                            + [''] * (-len(missing_fields_list) % 3),
+                            dtype=object
+                        )
+                        table_rows.extend([''] + row + [''] for row in checklist_cells.reshape(-1, 3).tolist())
+                    
+                    # No spacing between properties to maximize density
+    
+    story.append(LongTable(table_rows, colWidths=CHECKLIST_COL_WIDTHS, style=table_style))
     
     # Build the PDF
     try:
@@ -1202,7 +1155,165 @@ def generate_missing_fields_checklist_pdf(df):
         st.error(f"Error generating PDF: {str(e)}")
         return None
 
-def display_detailed_tables(df):
+# Detail table column alignment CSS - UPDATED WITHOUT Lead Count
+TABLE_CSS = """
+<style>
+.dataframe th:nth-child(1), .dataframe td:nth-child(1) { text-align: left !important; }    /* Property Name */
+.dataframe th:nth-child(2), .dataframe td:nth-child(2) { text-align: left !important; }    /* Status */
+.dataframe th:nth-child(3), .dataframe td:nth-child(3) { text-align: left !important; }    /* State */
+.dataframe th:nth-child(4), .dataframe td:nth-child(4) { text-align: left !important; }    /* County */
+.dataframe th:nth-child(5), .dataframe td:nth-child(5) { text-align: left !important; }    /* APN */
+.dataframe th:nth-child(6), .dataframe td:nth-child(6) { text-align: right !important; }   /* Acres */
+.dataframe th:nth-child(7), .dataframe td:nth-child(7) { text-align: right !important; }   /* Current Asking Price */
+.dataframe th:nth-child(8), .dataframe td:nth-child(8) { text-align: right !important; }   /* Cost Basis */
+.dataframe th:nth-child(9), .dataframe td:nth-child(9) { text-align: right !important; }   /* Profit Margin */
+.dataframe th:nth-child(10), .dataframe td:nth-child(10) { text-align: center !important; } /* Margin */
+.dataframe th:nth-child(11), .dataframe td:nth-child(11) { text-align: center !important; } /* Markup */
+.dataframe th:nth-child(12), .dataframe td:nth-child(12) { text-align: right !important; }  /* Asking Price/Acre */
+.dataframe th:nth-child(13), .dataframe td:nth-child(13) { text-align: right !important; }  /* Cost Basis/Acre */
+.dataframe th:nth-child(14), .dataframe td:nth-child(14) { text-align: right !important; }  /* Original Listing Price */
+.dataframe th:nth-child(15), .dataframe td:nth-child(15) { text-align: center !important; } /* %OLP */
+.dataframe th:nth-child(16), .dataframe td:nth-child(16) { text-align: center !important; } /* Days Held */
+.dataframe th:nth-child(17), .dataframe td:nth-child(17) { text-align: center !important; } /* Price Reductions */
+.dataframe th:nth-child(18), .dataframe td:nth-child(18) { text-align: center !important; } /* Last Map Audit */
+.dataframe th:nth-child(19), .dataframe td:nth-child(19) { text-align: left !important; }   /* Missing Information */
+</style>
+"""
+
+# Numeric detail columns stay numeric and are formatted in the browser (so they also sort numerically)
+CURRENCY_COLUMN = st.column_config.NumberColumn(format="$%,.0f")
+PERCENT_COLUMN = st.column_config.NumberColumn(format="%.0f%%")
+DETAIL_COLUMN_CONFIG = {
+    "Close.com Link": st.column_config.LinkColumn(
+        "Close.com Link",
+        help="Click to open property in Close.com",
+        display_text="🔗 Open"
+    ),
+    "Acres": st.column_config.NumberColumn(format="%.1f"),
+    "Current Asking Price": CURRENCY_COLUMN,
+    "Cost Basis": CURRENCY_COLUMN,
+    "Profit Margin": CURRENCY_COLUMN,
+    "Margin": PERCENT_COLUMN,                   # Margin with no decimals
+    "Markup": PERCENT_COLUMN,
+    "Asking Price/Acre": CURRENCY_COLUMN,
+    "Cost Basis/Acre": CURRENCY_COLUMN,
+    "Original Listing Price": CURRENCY_COLUMN,
+    "%OLP": PERCENT_COLUMN,
+    "Days Held": st.column_config.NumberColumn(format="%.0f")  # Rounded to whole days
+}
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=16)
+def build_display_df(filtered_df):
+    """Build the formatted detail table for the filtered properties (None if there is nothing to show)"""
+    # Select key columns for display - REMOVED Lead Count
+    desired_columns = [
+        'display_name',                         # Property Name (Left)
+        'id',                                   # ID for creating links
+        'primary_opportunity_status_label',     # Status (Left)
+        'custom.All_State',                     # State (Left)
+        'custom.All_County',                    # County (Left)
+        'custom.All_APN',                       # APN (Left)
+        'custom.All_Asset_Surveyed_Acres',      # Acres (Right)
+        'primary_opportunity_value',            # Current Asking Price (Right)
+        'custom.Asset_Cost_Basis',              # Cost Basis (Right)
+        'current_margin',                       # Profit Margin (Right)
+        'current_margin_pct',                   # Margin (Center)
+        'markup_percentage',                    # Markup (Center)
+        'price_per_acre',                       # Asking Price/Acre (Right)
+        'cost_basis_per_acre',                  # Cost Basis/Acre (Right)
+        'custom.Asset_Original_Listing_Price',  # Original Listing Price (Right)
+        'percent_of_initial_listing',           # %OLP (Center)
+        'days_held',                       # Days Held (Center)
+        'price_reductions',                     # Price Reductions (Center)
+        'custom.Asset_Last_Mapping_Audit',     # Last Mapping Audit (Center)
+        'missing_information'                   # Missing Information (Left)
+    ]
+    
+    # Force include columns
+    display_columns = [col for col in desired_columns if col in filtered_df.columns]
+    
+    if not display_columns:
+        return None
+    
+    # FORCE include Original Listing Price and Cost Basis per Acre if they exist
+    for col, before in [('custom.Asset_Original_Listing_Price', 'primary_opportunity_value'),
+                        ('cost_basis_per_acre', 'current_margin')]:
+        if col in filtered_df.columns and col not in display_columns:
+            display_pos = {c: i for i, c in enumerate(display_columns)}
+            display_columns.insert(display_pos.get(before, len(display_columns)), col)
+    
+    columns = {col: filtered_df[col] for col in display_columns}
+    
+    # Create Property Name with Link column - simpler approach
+    if 'display_name' in columns and 'id' in columns:
+        # Replace the original columns with the clean property name and link, placed first
+        ids = columns.pop('id')
+        has_id = (ids.notna() & (ids != '')).to_numpy()
+        columns = {
+            'Property Name': columns.pop('display_name').fillna("Unknown Property"),
+            'Close.com Link': pd.Series(np.where(has_id, "https://app.close.com/lead/" + ids.astype(str), ""), index=ids.index),
+            **columns
+        }
+    
+    # Assemble the table in its final column order without a defensive copy; every column is replaced, not edited in place
+    display_df = pd.DataFrame(columns, copy=False)
+    
+    # Currency, percentage and numeric columns are formatted by DETAIL_COLUMN_CONFIG
+    # Price Reductions: dash for none, lowercase x for reductions (already-formatted strings are left alone)
+    if 'price_reductions' in display_df.columns and pd.api.types.is_numeric_dtype(display_df['price_reductions']):
+        reductions = display_df['price_reductions']
+        display_df['price_reductions'] = np.select(
+            [reductions.isna().to_numpy(), (reductions == 0).to_numpy()],
+            ["N/A", "-"],
+            default=(reductions.fillna(0).round().astype(int).astype(str) + "x").to_numpy(dtype=object)
+        )
+    
+    # Format Last Mapping Audit date with 60-day warning
+    if 'custom.Asset_Last_Mapping_Audit' in display_df.columns:
+        audit_values = display_df['custom.Asset_Last_Mapping_Audit']
+        # Parse the whole column at once; each value is parsed on its own format
+        audit_dates = parse_dates(audit_values)
+        formatted_dates = audit_dates.dt.strftime('%m/%d/%Y')
+        
+        # Flag audits more than 60 days old
+        is_stale = ((pd.Timestamp.now() - audit_dates).dt.days > 60).to_numpy()
+        
+        display_df['custom.Asset_Last_Mapping_Audit'] = np.select(
+            [(audit_values.isna() | (audit_values == '')).to_numpy(), audit_dates.isna().to_numpy(), is_stale],
+            ["N/A", audit_values.astype(str).to_numpy(dtype=object), ("🔴 " + formatted_dates).to_numpy(dtype=object)],  # Unparseable values are shown as-is
+            default=formatted_dates.to_numpy(dtype=object)
+        )
+    
+    # Color-code the Status column with emojis (Streamlit dataframes don't support HTML)
+    if 'primary_opportunity_status_label' in display_df.columns:
+        statuses = display_df['primary_opportunity_status_label'].astype(object)
+        display_df['primary_opportunity_status_label'] = statuses.map(STATUS_LABELS).fillna(statuses)
+    
+    # Rename columns for display - Property Name and Close.com Link are already named correctly
+    display_df = display_df.rename(columns={
+        'primary_opportunity_status_label': 'Status',
+        'custom.All_State': 'State',
+        'custom.All_County': 'County',
+        'custom.All_APN': 'APN',
+        'custom.All_Asset_Surveyed_Acres': 'Acres',
+        'primary_opportunity_value': 'Current Asking Price',
+        'custom.Asset_Cost_Basis': 'Cost Basis',
+        'current_margin': 'Profit Margin',
+        'current_margin_pct': 'Margin',
+        'markup_percentage': 'Markup',
+        'price_per_acre': 'Asking Price/Acre',
+        'cost_basis_per_acre': 'Cost Basis/Acre',
+        'custom.Asset_Original_Listing_Price': 'Original Listing Price',
+        'percent_of_initial_listing': '%OLP',
+        'days_held': 'Days Held',
+        'price_reductions': 'Price Reductions',
+        'custom.Asset_Last_Mapping_Audit': 'Last Map Audit',
+        'missing_information': 'Missing Information'
+    })
+    
+    return display_df
+
+def display_detailed_tables(df, agg):
     """Display detailed property information with filtering"""
     st.header("📋 Detailed Property Information")
     
@@ -1219,7 +1330,7 @@ def display_detailed_tables(df):
         if 'custom.All_State' in df.columns:
             state_filter = st.selectbox(
                 "Filter by State",
-                ["All"] + sorted(df['custom.All_State'].unique().tolist())
+                ["All"] + agg['state_sorted']
             )
         else:
             state_filter = "All"
@@ -1228,249 +1339,45 @@ def display_detailed_tables(df):
         if 'custom.All_County' in df.columns:
             county_filter = st.selectbox(
                 "Filter by County",
-                ["All"] + sorted(df['custom.All_County'].unique().tolist())
+                ["All"] + agg['county_sorted']
             )
         else:
             county_filter = "All"
     
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters as one combined mask so only a single subset is materialized
+    mask = np.ones(len(df), dtype=bool)
     if status_filter != "All":
-        filtered_df = filtered_df[filtered_df['primary_opportunity_status_label'] == status_filter]
+        mask &= (df['primary_opportunity_status_label'] == status_filter).to_numpy()
     if state_filter != "All":
-        filtered_df = filtered_df[filtered_df['custom.All_State'] == state_filter]
+        mask &= (df['custom.All_State'] == state_filter).to_numpy()
     if county_filter != "All":
-        filtered_df = filtered_df[filtered_df['custom.All_County'] == county_filter]
+        mask &= (df['custom.All_County'] == county_filter).to_numpy()
+    filtered_df = df[mask]
     
     # Apply default sort order: Status (custom order), State (alphabetical), County (alphabetical)
     if len(filtered_df) > 0:
-        # Create a status order mapping for sorting
-        status_order_map = {'Purchased': 1, 'Listed': 2, 'Under Contract': 3, 'Off Market': 4}
-        
-        # Add temporary sort column for status ordering
-        if 'primary_opportunity_status_label' in filtered_df.columns:
-            filtered_df['_status_sort'] = filtered_df['primary_opportunity_status_label'].map(status_order_map).fillna(999)
-        
-        # Sort by: Status (custom order), State (alphabetical), County (alphabetical)
         sort_columns = []
         if 'primary_opportunity_status_label' in filtered_df.columns:
-            sort_columns.append('_status_sort')
+            sort_columns.append('primary_opportunity_status_label')
         if 'custom.All_State' in filtered_df.columns:
             sort_columns.append('custom.All_State')
         if 'custom.All_County' in filtered_df.columns:
             sort_columns.append('custom.All_County')
         
         if sort_columns:
-            filtered_df = filtered_df.sort_values(sort_columns, ascending=True)
-        
-        # Remove the temporary sort column
-        if '_status_sort' in filtered_df.columns:
-            filtered_df = filtered_df.drop('_status_sort', axis=1)
+            # Status is ordered through an ordered categorical sort key, so the subset is never mutated
+            filtered_df = filtered_df.sort_values(
+                sort_columns, ascending=True, kind='mergesort',
+                key=lambda col: order_statuses(col) if col.name == 'primary_opportunity_status_label' else col
+            )
     
     st.subheader(f"Showing {len(filtered_df)} properties")
     
-    # Select key columns for display - REMOVED Lead Count
-    desired_columns = [
-        'display_name',                         # Property Name (Left)
-        'id',                                   # ID for creating links
-        'primary_opportunity_status_label',     # Status (Left)
-        'custom.All_State',                     # State (Left)
-        'custom.All_County',                    # County (Left)
-        'custom.All_APN',                       # APN (Left)
-        'custom.All_Asset_Surveyed_Acres',      # Acres (Right)
-        'primary_opportunity_value',            # Current Asking Price (Right)
-        'custom.Asset_Cost_Basis',              # Cost Basis (Right)
-        'current_margin',                       # Profit Margin (Right)
-        'current_margin_pct',                   # Margin (Center)
-        'markup_percentage',                    # Markup (Center)
-        'price_per_acre',                       # Asking Price/Acre (Right)
-        'cost_basis_per_acre',                  # Cost Basis/Acre (Right)
-        'custom.Asset_Original_Listing_Price',  # Original Listing Price (Right)
-        'percent_of_initial_listing',           # %OLP (Center)
-        'days_held',                       # Days Held (Center)
-        'price_reductions',                     # Price Reductions (Center)
-        'custom.Asset_Last_Mapping_Audit',     # Last Mapping Audit (Center)
-        'missing_information'                   # Missing Information (Left)
-    ]
+    # Drop the missing_fields list column so the cache key hashes without falling back to pickle
+    display_df = build_display_df(filtered_df.drop(columns='missing_fields', errors='ignore'))
     
-    # Force include columns
-    display_columns = []
-    for col in desired_columns:
-        if col in filtered_df.columns:
-            display_columns.append(col)
-    
-    if display_columns:
-        # FORCE include Original Listing Price if it exists
-        if 'custom.Asset_Original_Listing_Price' in filtered_df.columns and 'custom.Asset_Original_Listing_Price' not in display_columns:
-            try:
-                pos = display_columns.index('primary_opportunity_value')
-                display_columns.insert(pos, 'custom.Asset_Original_Listing_Price')
-            except ValueError:
-                display_columns.append('custom.Asset_Original_Listing_Price')
-        
-        # FORCE include Cost Basis per Acre if it exists
-        if 'cost_basis_per_acre' in filtered_df.columns and 'cost_basis_per_acre' not in display_columns:
-            try:
-                pos = display_columns.index('current_margin')
-                display_columns.insert(pos, 'cost_basis_per_acre')
-            except ValueError:
-                display_columns.append('cost_basis_per_acre')
-        
-        display_df = filtered_df[display_columns].copy()
-        
-        # Create Property Name with Link column - simpler approach
-        if 'display_name' in display_df.columns and 'id' in display_df.columns:
-            def create_property_name(row):
-                property_name = row['display_name'] if pd.notna(row['display_name']) else "Unknown Property"
-                return property_name
-            
-            def create_link_url(row):
-                property_id = row['id'] if pd.notna(row['id']) else ""
-                if property_id:
-                    return f"https://app.close.com/lead/{property_id}"
-                else:
-                    return ""
-            
-            # Create the clean property name and separate link columns
-            display_df['Property Name'] = display_df.apply(create_property_name, axis=1)
-            display_df['Close.com Link'] = display_df.apply(create_link_url, axis=1)
-            
-            # Remove the original columns
-            display_df = display_df.drop(['display_name', 'id'], axis=1)
-            
-            # Reorder columns to put Property Name and Link first
-            cols = list(display_df.columns)
-            # Remove these columns from their current positions
-            if 'Property Name' in cols:
-                cols.remove('Property Name')
-            if 'Close.com Link' in cols:
-                cols.remove('Close.com Link')
-            # Insert them at the beginning
-            cols.insert(0, 'Close.com Link')
-            cols.insert(0, 'Property Name')
-            display_df = display_df[cols]
-        
-        # Format currency columns
-        currency_columns = ['custom.Asset_Original_Listing_Price', 'primary_opportunity_value', 'custom.Asset_Cost_Basis', 'cost_basis_per_acre', 'current_margin', 'price_per_acre']
-        for col in currency_columns:
-            if col in display_df.columns:
-                display_df[col] = display_df[col].apply(lambda x: f"${x:,.0f}" if pd.notna(x) else "N/A")
-        
-        # Format percentage columns
-        percentage_columns = ['markup_percentage', 'percent_of_initial_listing']
-        for col in percentage_columns:
-            if col in display_df.columns:
-                display_df[col] = display_df[col].apply(lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A")
-        
-        # Format margin percentage separately with no decimals
-        if 'current_margin_pct' in display_df.columns:
-            display_df['current_margin_pct'] = display_df['current_margin_pct'].apply(lambda x: f"{x:.0f}%" if pd.notna(x) else "N/A")
-        
-        # Format numeric columns (including rounded Days Held)
-        if 'custom.All_Asset_Surveyed_Acres' in display_df.columns:
-            display_df['custom.All_Asset_Surveyed_Acres'] = display_df['custom.All_Asset_Surveyed_Acres'].apply(lambda x: f"{x:.1f}" if pd.notna(x) else "N/A")
-        
-        # Format Days Held with no decimals (rounded to whole days)
-        if 'days_held' in display_df.columns:
-            display_df['days_held'] = display_df['days_held'].apply(lambda x: f"{x:.0f}" if pd.notna(x) else "N/A")
-        
-        # Format price reductions with dash for none, lowercase x for reductions
-        if 'price_reductions' in display_df.columns:
-            display_df['price_reductions'] = display_df['price_reductions'].apply(
-                lambda x: "-" if pd.notna(x) and x == 0 else f"{x:.0f}x" if pd.notna(x) else "N/A"
-            )
-        
-        # Format Last Mapping Audit date with 60-day warning
-        if 'custom.Asset_Last_Mapping_Audit' in display_df.columns:
-            def format_audit_date(date_val):
-                if pd.isna(date_val) or date_val == '':
-                    return "N/A"
-                try:
-                    # Try to parse the date and format it nicely
-                    parsed_date = pd.to_datetime(date_val)
-                    formatted_date = parsed_date.strftime('%m/%d/%Y')
-                    
-                    # Check if more than 60 days old
-                    days_old = (datetime.now() - parsed_date).days
-                    if days_old > 60:
-                        return f"🔴 {formatted_date}"
-                    else:
-                        return formatted_date
-                except:
-                    return str(date_val)  # Return as-is if parsing fails
-            
-            display_df['custom.Asset_Last_Mapping_Audit'] = display_df['custom.Asset_Last_Mapping_Audit'].apply(format_audit_date)
-        
-        # Color-code the Status column with emojis (Streamlit dataframes don't support HTML)
-        if 'primary_opportunity_status_label' in display_df.columns:
-            def format_status(status):
-                if status == 'Purchased':
-                    return f'🔴 {status}'     # Red circle
-                elif status == 'Listed':
-                    return f'🔵 {status}'     # Blue circle
-                elif status == 'Under Contract':
-                    return f'🟢 {status}'     # Green circle
-                elif status == 'Off Market':
-                    return f'🟡 {status}'     # Yellow circle
-                else:
-                    return status
-            
-            display_df['primary_opportunity_status_label'] = display_df['primary_opportunity_status_label'].apply(format_status)
-        
-        # Rename columns for display - Property Name and Close.com Link are already named correctly
-        display_df = display_df.rename(columns={
-            'primary_opportunity_status_label': 'Status',
-            'custom.All_State': 'State',
-            'custom.All_County': 'County',
-            'custom.All_APN': 'APN',
-            'custom.All_Asset_Surveyed_Acres': 'Acres',
-            'primary_opportunity_value': 'Current Asking Price',
-            'custom.Asset_Cost_Basis': 'Cost Basis',
-            'current_margin': 'Profit Margin',
-            'current_margin_pct': 'Margin',
-            'markup_percentage': 'Markup',
-            'price_per_acre': 'Asking Price/Acre',
-            'cost_basis_per_acre': 'Cost Basis/Acre',
-            'custom.Asset_Original_Listing_Price': 'Original Listing Price',
-            'percent_of_initial_listing': '%OLP',
-            'days_held': 'Days Held',
-            'price_reductions': 'Price Reductions',
-            'custom.Asset_Last_Mapping_Audit': 'Last Map Audit',
-            'missing_information': 'Missing Information'
-        })
-        
-        # Display table with custom CSS for column alignment - UPDATED WITHOUT Lead Count
-        st.markdown("""
-        <style>
-        .dataframe th:nth-child(1), .dataframe td:nth-child(1) { text-align: left !important; }    /* Property Name */
-        .dataframe th:nth-child(2), .dataframe td:nth-child(2) { text-align: left !important; }    /* Status */
-        .dataframe th:nth-child(3), .dataframe td:nth-child(3) { text-align: left !important; }    /* State */
-        .dataframe th:nth-child(4), .dataframe td:nth-child(4) { text-align: left !important; }    /* County */
-        .dataframe th:nth-child(5), .dataframe td:nth-child(5) { text-align: left !important; }    /* APN */
-        .dataframe th:nth-child(6), .dataframe td:nth-child(6) { text-align: right !important; }   /* Acres */
-        .dataframe th:nth-child(7), .dataframe td:nth-child(7) { text-align: right !important; }   /* Current Asking Price */
-        .dataframe th:nth-child(8), .dataframe td:nth-child(8) { text-align: right !important; }   /* Cost Basis */
-        .dataframe th:nth-child(9), .dataframe td:nth-child(9) { text-align: right !important; }   /* Profit Margin */
-        .dataframe th:nth-child(10), .dataframe td:nth-child(10) { text-align: center !important; } /* Margin */
-        .dataframe th:nth-child(11), .dataframe td:nth-child(11) { text-align: center !important; } /* Markup */
-        .dataframe th:nth-child(12), .dataframe td:nth-child(12) { text-align: right !important; }  /* Asking Price/Acre */
-        .dataframe th:nth-child(13), .dataframe td:nth-child(13) { text-align: right !important; }  /* Cost Basis/Acre */
-        .dataframe th:nth-child(14), .dataframe td:nth-child(14) { text-align: right !important; }  /* Original Listing Price */
-        .dataframe th:nth-child(15), .dataframe td:nth-child(15) { text-align: center !important; } /* %OLP */
-        .dataframe th:nth-child(16), .dataframe td:nth-child(16) { text-align: center !important; } /* Days Held */
-        .dataframe th:nth-child(17), .dataframe td:nth-child(17) { text-align: center !important; } /* Price Reductions */
-        .dataframe th:nth-child(18), .dataframe td:nth-child(18) { text-align: center !important; } /* Last Map Audit */
-        .dataframe th:nth-child(19), .dataframe td:nth-child(19) { text-align: left !important; }   /* Missing Information */
-        </style>
-        """, unsafe_allow_html=True)
-        
-        st.dataframe(display_df, use_container_width=True, column_config={
-            "Close.com Link": st.column_config.LinkColumn(
-                "Close.com Link",
-                help="Click to open property in Close.com",
-                display_text="🔗 Open"
-            )
-        })
+    if display_df is not None:
+        st.dataframe(display_df, use_container_width=True, column_config=DETAIL_COLUMN_CONFIG)
         
         # Add Inventory Report download button with timestamped filename
         st.subheader("📊 Download Inventory Report")
@@ -1489,6 +1396,10 @@ def display_detailed_tables(df):
 
 def main():
     st.title("🏞️ Land Portfolio Analyzer")
+    
+    # Static table alignment CSS (must be re-emitted each run or Streamlit drops it from the page)
+    st.markdown(TABLE_CSS, unsafe_allow_html=True)
+    
     st.markdown("### Hierarchical Analysis: Opportunity Status → State → County")
     st.markdown("**Status Order**: Purchased → Listed → Under Contract → Off Market")
     
@@ -1496,11 +1407,10 @@ def main():
     
     if uploaded_file:
         try:
-            df = pd.read_csv(uploaded_file)
-            st.success(f"✅ Loaded {len(df)} properties successfully!")
-            
-            # Process the data
-            processed_df = process_data(df)
+            # Read and process the data
+            file_bytes = uploaded_file.getvalue()
+            processed_df = load_portfolio(file_bytes)
+            st.success(f"✅ Loaded {len(processed_df)} properties successfully!")
             
             # Data Validation Warnings Section
             st.subheader("⚠️ Data Validation Warnings")
@@ -1669,7 +1579,7 @@ def main():
             # Data Completeness Summary (moved to top)
             if 'missing_information' in processed_df.columns:
                 st.subheader("📊 Data Completeness Summary")
-                complete_count = len(processed_df[processed_df['missing_information'] == '✅ Complete'])
+                complete_count = int(processed_df['is_complete'].sum())
                 incomplete_count = len(processed_df) - complete_count
                 
                 col1, col2, col3 = st.columns(3)
@@ -1684,39 +1594,37 @@ def main():
                 # Show most common missing fields
                 if incomplete_count > 0:
                     st.write("**Most Common Missing Fields:**")
-                    incomplete_props = processed_df[processed_df['missing_information'] != '✅ Complete']
-                    missing_fields_list = []
-                    for missing_info in incomplete_props['missing_information']:
-                        if missing_info.startswith('❌ Missing: '):
-                            fields = missing_info.replace('❌ Missing: ', '').split(', ')
-                            missing_fields_list.extend(fields)
+                    # Count straight from the per-property missing field lists (complete rows explode to NaN and are dropped)
+                    field_counts = processed_df['missing_fields'].explode().value_counts()
                     
-                    if missing_fields_list:
-                        from collections import Counter
-                        field_counts = Counter(missing_fields_list)
-                        missing_summary = []
-                        for field, count in field_counts.most_common():
-                            percentage = (count / len(processed_df)) * 100
-                            missing_summary.append({
-                                'Missing Field': field,
-                                'Properties Missing': count,
-                                'Percentage': f"{percentage:.1f}%"
-                            })
+                    if len(field_counts) > 0:
+                        missing_summary = field_counts.rename_axis('Missing Field').reset_index(name='Properties Missing')
+                        missing_summary['Percentage'] = (missing_summary['Properties Missing'] / len(processed_df) * 100).map('{:.1f}%'.format)
                         
-                        st.dataframe(pd.DataFrame(missing_summary), use_container_width=True)
+                        st.dataframe(missing_summary, use_container_width=True)
                 
                 # Add PDF download button for missing fields checklist
                 st.subheader("📄 Download Missing Fields Checklist")
-                if st.button("Generate PDF Checklist", type="primary", key="checklist_top"):
-                    pdf_buffer = generate_missing_fields_checklist_pdf(processed_df)
-                    if pdf_buffer:
-                        st.download_button(
-                            label="📥 Download PDF Checklist",
-                            data=pdf_buffer,
-                            file_name=f"missing_fields_checklist_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                            mime="application/pdf",
-                            key="download_checklist_top"
-                        )
+                if REPORTLAB_AVAILABLE:
+                    def checklist_pdf_bytes():
+                        # Runs in the download thread, where st.error is ignored; raising makes
+                        # Streamlit show its "Failed to generate file" message instead
+                        pdf_buffer = generate_missing_fields_checklist_pdf(processed_df, file_bytes, datetime.now().strftime('%m/%d/%Y'))
+                        if pdf_buffer is None:
+                            raise RuntimeError("Could not generate the missing fields checklist PDF")
+                        return pdf_buffer.getvalue()
+
+                    # The PDF is only built when the button is clicked (and cached per dataset)
+                    st.download_button(
+                        label="📥 Download PDF Checklist",
+                        data=checklist_pdf_bytes,
+                        file_name=f"missing_fields_checklist_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                        mime="application/pdf",
+                        type="primary",
+                        key="download_checklist_top"
+                    )
+                else:
+                    st.error("PDF generation requires reportlab. Please install it: pip install reportlab")
             
             st.divider()
             
@@ -1730,43 +1638,32 @@ def main():
                 all_owners = sorted([owner for owner in all_owners if str(owner) != 'nan'])
                 
                 if len(all_owners) > 0:
-                    # Create columns for checkboxes (3 per row for better layout)
-                    cols_per_row = 3
-                    rows_needed = (len(all_owners) + cols_per_row - 1) // cols_per_row
-                    
                     # Add "Select All" and "Deselect All" buttons
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
                         if st.button("✅ Select All Owners"):
-                            for owner in all_owners:
-                                st.session_state[f"owner_{owner}"] = True
+                            st.session_state["selected_owners"] = all_owners
                     with col2:
                         if st.button("❌ Deselect All Owners"):
-                            for owner in all_owners:
-                                st.session_state[f"owner_{owner}"] = False
+                            st.session_state["selected_owners"] = []
                     
-                    # Initialize session state for owners if not exists
-                    for owner in all_owners:
-                        if f"owner_{owner}" not in st.session_state:
-                            st.session_state[f"owner_{owner}"] = True  # Default to checked
+                    # Initialize the owner selection for each new upload; a kept selection would
+                    # leave owners that first appear in this file unchecked
+                    upload_key = hash(file_bytes)
+                    if "selected_owners" not in st.session_state or st.session_state.get("selected_owners_upload") != upload_key:
+                        st.session_state["selected_owners_upload"] = upload_key
+                        st.session_state["selected_owners"] = all_owners  # Default to all selected
                     
-                    # Create checkboxes for each owner
-                    for i in range(rows_needed):
-                        cols = st.columns(cols_per_row)
-                        for j in range(cols_per_row):
-                            owner_index = i * cols_per_row + j
-                            if owner_index < len(all_owners):
-                                owner = all_owners[owner_index]
-                                owner_count = len(processed_df[processed_df['custom.Asset_Owner'] == owner])
-                                with cols[j]:
-                                    st.session_state[f"owner_{owner}"] = st.checkbox(
-                                        f"{owner} ({owner_count} properties)",
-                                        value=st.session_state[f"owner_{owner}"],
-                                        key=f"checkbox_owner_{owner}"
-                                    )
+                    # Property counts per owner in one pass, for the option labels
+                    owner_counts = processed_df['custom.Asset_Owner'].value_counts().to_dict()
                     
-                    # Filter data based on selected owners
-                    selected_owners = [owner for owner in all_owners if st.session_state.get(f"owner_{owner}", True)]
+                    # One multiselect for all owners instead of a checkbox per owner
+                    selected_owners = st.multiselect(
+                        "Owners",
+                        options=all_owners,
+                        format_func=lambda owner: f"{owner} ({owner_counts.get(owner, 0)} properties)",
+                        key="selected_owners"
+                    )
                     
                     if selected_owners:
                         # Filter the dataframe to only include selected owners
@@ -1786,18 +1683,21 @@ def main():
             
             st.divider()
             
+            # Status/state/county counts shared by the sections below
+            agg = summarize_dimensions(filtered_df)
+            
             # Main hierarchy analysis
-            display_hierarchy_breakdown(filtered_df)
+            display_hierarchy_breakdown(filtered_df, agg)
             
             st.divider()
             
             # Visualizations
-            create_visualizations(filtered_df)
+            create_visualizations(filtered_df, agg)
             
             st.divider()
             
             # Detailed tables with filtering
-            display_detailed_tables(filtered_df)
+            display_detailed_tables(filtered_df, agg)
             
             # Raw data preview
             with st.expander("🔍 Raw Data Preview"):